@@ -822,11 +822,18 @@ def NeRFDeltaView():
     uncertainty_volume, uncertainty_reader = helpers.vtk_read_volume_from_file(uncertainty_file_path)
     
 
-    means_file = os.path.join(data_folder, "uncertainty_means.csv")
-    stddev_file = os.path.join(data_folder, "uncertainty_standard_deviations.csv")
+    # Heatmap data written by preprocessing_2DTF_heatmap.py, older versions wrote two CSV files
+    uncertainty_file = os.path.join(data_folder, "uncertainty.npz")
+    if os.path.exists(uncertainty_file):
+        with np.load(uncertainty_file) as uncertainty_data:
+            uncertainty_means = uncertainty_data["means"]
+            uncertainty_standard_deviations = uncertainty_data["std"]
+    else:
+        means_file = os.path.join(data_folder, "uncertainty_means.csv")
+        stddev_file = os.path.join(data_folder, "uncertainty_standard_deviations.csv")
 
-    uncertainty_means = np.loadtxt(means_file, delimiter=",")
-    uncertainty_standard_deviations = np.loadtxt(stddev_file, delimiter=",")
+        uncertainty_means = np.loadtxt(means_file, delimiter=",")
+        uncertainty_standard_deviations = np.loadtxt(stddev_file, delimiter=",")
 
 
     angles_file = os.path.join(data_folder, "angles_{}__{}.csv".format(dataset_size, dataset))
@@ -1269,8 +1276,9 @@ def NeRFDeltaView():
     layout_frame_left.addLayout(heatmap_label_layout)
 
 
-    data_opacity = np.array(opacity_volume.GetPointData().GetScalars())
-    data_uncertainty = np.array(uncertainty_volume.GetPointData().GetScalars())
+    # Views on the volumes' scalar arrays, no copy
+    data_opacity = numpy_support.vtk_to_numpy(opacity_volume.GetPointData().GetScalars())
+    data_uncertainty = numpy_support.vtk_to_numpy(uncertainty_volume.GetPointData().GetScalars())
 
     def update_histogram(num_bins):
         """
@@ -1294,15 +1302,19 @@ def NeRFDeltaView():
         It then updates the histogram data in the transfer function for each type of data. 
         Finally, it redraws the histograms to reflect the changes.
         """
+        # The tables are cached per plot and number of bins, the histograms are written straight into their buffers
+        cache_scene = helpers.vtk_get_table_cache(histogram_dict['histogram_scene'], num_bins)
+        cache_uncertainty = helpers.vtk_get_table_cache(histogram_dict['histogram_uncertainty'], num_bins)
+
         # data_opacity, _ = helpers.vtk_structured_point_value_array(opacity_reader)
-        hist_norm_opacity = helpers.create_histogram_array(data_opacity, num_bins=num_bins, filter=False)
+        hist_norm_opacity = helpers.create_histogram_array(data_opacity, num_bins=num_bins, filter=False, out=cache_scene.val_arr)
 
         # data_uncertainty, _ = helpers.vtk_structured_point_value_array(uncertainty_reader)
-        hist_norm_uncertainty = helpers.create_histogram_array(data_uncertainty, num_bins=num_bins, filter=True, filter_threshold=histogram_uncertainty_filter)
+        hist_norm_uncertainty = helpers.create_histogram_array(data_uncertainty, num_bins=num_bins, filter=True, filter_threshold=histogram_uncertainty_filter, out=cache_uncertainty.val_arr)
 
         # Update the histogram data in the transfer function
-        histogram_dict['histogram_scene'].SetInputData(helpers.vtk_create_table(hist_norm_opacity), 0, 1)
-        histogram_dict['histogram_uncertainty'].SetInputData(helpers.vtk_create_table(hist_norm_uncertainty), 0, 1)
+        histogram_dict['histogram_scene'].SetInputData(helpers.vtk_create_table(hist_norm_opacity, cache=cache_scene), 0, 1)
+        histogram_dict['histogram_uncertainty'].SetInputData(helpers.vtk_create_table(hist_norm_uncertainty, cache=cache_uncertainty), 0, 1)
 
         # Redraw the histogram
         # interactor_dict['interactor_tf_opacity'].GetRenderWindow().Render()
@@ -1316,10 +1328,6 @@ def NeRFDeltaView():
     Selected points from the scatter plot (uncertainties color and density)
     """
     data_uncertainty_volume = uncertainty_volume.GetPointData().GetScalars()
-    npoints_uncertainty_volume = uncertainty_volume.GetNumberOfPoints()
-    npoints_uncertainty_volume_ind = np.arange(npoints_uncertainty_volume)
-
-    data_uncertainty = np.array(uncertainty_volume.GetPointData().GetScalars())
 
     def selectedInd(ind):
         """
@@ -1351,11 +1359,10 @@ def NeRFDeltaView():
             # uncertainty_volume.GetPointData().SetScalars(alpha)
             # update_histogram(spin_box.value())
 
+            # Keep the uncertainty of the selected points, zero everywhere else
             alpha_data_uncertainty = numpy_support.vtk_to_numpy(data_uncertainty_volume)
-            copy_alpha_data_uncertainty = np.copy(alpha_data_uncertainty)
-            mask = ~np.isin(npoints_uncertainty_volume_ind, ind)
-            ind_inverse = npoints_uncertainty_volume_ind[mask]
-            copy_alpha_data_uncertainty[ind_inverse] = 0.0
+            copy_alpha_data_uncertainty = np.zeros_like(alpha_data_uncertainty)
+            copy_alpha_data_uncertainty[ind] = alpha_data_uncertainty[ind]
             alpha_uncertainty = numpy_support.numpy_to_vtk(num_array=copy_alpha_data_uncertainty, deep=True)
             uncertainty_volume.GetPointData().SetScalars(alpha_uncertainty)
 
@@ -1491,7 +1498,7 @@ def NeRFDeltaView():
                 #     chart_dict['historgram_chart'].GetScene().AddPlot(isosurface_dict['isosurface_value'])  # Add the isosurface to the scene
                 # except Exception as error:
                 #     print("An error occurred:", error)
-                isosurface_dict['isosurface_value'].SetInputData(helpers.vtk_create_vertical_line_table(line=True), 0, 1)
+                helpers.vtk_update_vertical_line(isosurface_dict['isosurface_value'].GetInput(), isosurface_filter_value, line=True)
 
                 renderer_opacity_uncertainty.AddVolume(volume_opacity)
 
@@ -1504,7 +1511,7 @@ def NeRFDeltaView():
                 #     chart_dict['historgram_chart'].GetScene().RemovePlot(isosurface_dict['isosurface_value'])  # Remove the isosurface from the scene
                 # except Exception as error:
                 #     print("An error occurred:", error)
-                isosurface_dict['isosurface_value'].SetInputData(helpers.vtk_create_vertical_line_table(line=False), 0, 1)
+                helpers.vtk_update_vertical_line(isosurface_dict['isosurface_value'].GetInput(), isosurface_filter_value, line=False)
 
                 renderer_opacity_uncertainty.RemoveVolume(volume_opacity)
 
@@ -1550,8 +1557,9 @@ def NeRFDeltaView():
         Generates a scatter plot based on the uncertainty data
         """
         data_uncertainty, dims_uncertainty = helpers.vtk_structured_point_value_array(uncertainty_reader)
-        data_scatter_plot = np.zeros((len(data_uncertainty),2))
-        data_scatter_plot[:,0] = data_uncertainty
+        # Uncertainty values in the first column, zeros in the second
+        # (vstack + .T is only valid since both operands are 1D arrays of equal length)
+        data_scatter_plot = np.vstack((data_uncertainty, np.zeros_like(data_uncertainty))).T
 
         scatter_plot = ScatterPlot(UI_helpers.frame_dict['frame_tab1_10'], selectedInd, data=data_scatter_plot)
         scatter_plot_dict["scatter_plot"] = scatter_plot
@@ -1561,22 +1569,18 @@ def NeRFDeltaView():
     TAB 2 (mean and standard deviation)
     """
     # Shift angles in the y-axis
-    angles_shift_y = []
-    for i in range(len(angles)):
-        angle_y_shifted = angles[i][1] if angles[i][1]==0 or angles[i][1]==360 else 360.0-angles[i][1]
-        angles_shift_y.append([angles[i][0], angle_y_shifted])
+    angle_x = angles[:, 0]
+    angle_y = angles[:, 1]
+    angle_y = np.where((angle_y == 0) | (angle_y == 360), angle_y, 360.0 - angle_y)
 
     # Shift angles in both x and y axes
-    angles_list = []
-    for i in range(len(angles_shift_y)):
-        angle_x_shifted = angles_shift_y[i][0]+180.0 if angles_shift_y[i][0]<180 else angles_shift_y[i][0]-180.0
-        angle_y_shifted = angles_shift_y[i][1]+180.0 if angles_shift_y[i][1]<180 else angles_shift_y[i][1]-180.0
-        angles_list.append([angle_x_shifted, angle_y_shifted])
-    angles_ = np.array(angles_list)
+    angle_x_shifted = np.where(angle_x < 180, angle_x + 180.0, angle_x - 180.0)
+    angle_y_shifted = np.where(angle_y < 180, angle_y + 180.0, angle_y - 180.0)
+    # (vstack + .T is only valid since both operands are 1D arrays of equal length)
+    angles_ = np.vstack((angle_x_shifted, angle_y_shifted)).T
 
     # Shift heatmap data
-    uncertainty_means_ = helpers.shift_heatmap(uncertainty_means)
-    uncertainty_standard_deviations_ = helpers.shift_heatmap(uncertainty_standard_deviations)
+    uncertainty_means_, uncertainty_standard_deviations_ = helpers.shift_heatmap(np.stack((uncertainty_means, uncertainty_standard_deviations)))
 
     # normalize the array for meaningful comparison between heatmaps
     def normalize_array(arr):
@@ -167,10 +167,9 @@ class HeatMap(QVBoxLayout):
         None
         """
         # Scale the scatter plot data to match the dimensions of the heatmap
-        scaled_data_angles = np.zeros((len(self.data_angles),2))
-        for i in range(len(self.data_angles)):
-            scaled_data_angles[i, 0] = (self.data_angles[i,0]/360)*(self.num_elevation-1)
-            scaled_data_angles[i, 1] = (self.data_angles[i,1]/360)*(self.num_azimuth-1)
+        # (vstack + .T is only valid since both operands are 1D arrays of equal length)
+        scaled_data_angles = np.vstack(((self.data_angles[:, 0]/360)*(self.num_elevation-1),
+                                        (self.data_angles[:, 1]/360)*(self.num_azimuth-1))).T
 
         self.scatter_plot_angles = self.ax.scatter(scaled_data_angles[:,0], scaled_data_angles[:,1], color='blue', s=20, edgecolor='none', alpha=1.0)
 
@@ -203,9 +202,9 @@ class HeatMap(QVBoxLayout):
 
             list_xy = [[x, y]]
             
-            for i in range(len(list_xy)):
-                if (list_xy[i][0]>=0 and list_xy[i][1]>=0) or (list_xy[i][0]<=24 and list_xy[i][1]<=24):
-                    rect = Rectangle((list_xy[i][0] - 0.5, list_xy[i][1] - 0.5), 1, 1, fill=False, edgecolor='black', linewidth=2)
+            for xy in list_xy:
+                if (xy[0]>=0 and xy[1]>=0) or (xy[0]<=24 and xy[1]<=24):
+                    rect = Rectangle((xy[0] - 0.5, xy[1] - 0.5), 1, 1, fill=False, edgecolor='black', linewidth=2)
                     self.ax.add_patch(rect)
                     self.rectangles.append(rect)
 
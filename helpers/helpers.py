@@ -1,7 +1,27 @@
 from logging.handlers import TimedRotatingFileHandler
+import functools
+import weakref
+from dataclasses import dataclass
 import vtk
 import numpy as np
 
+import vtk.util.numpy_support as numpy_support
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import cupy
+except ImportError:
+    cupy = None
+
 from PyQt6.QtWidgets import (
     QWidget,
     QSizePolicy,
@@ -31,6 +51,32 @@ from PyQt6.QtGui import (
 
 colors = vtk.vtkNamedColors()
 
+# Semi-transparent fill color (RGBA) of the rectangles drawn by vtk_create_rectangle
+_blue = colors.GetColor3d("blue")
+_BLUE_RGBA = (_blue.GetRed(), _blue.GetGreen(), _blue.GetBlue(), 0.2)
+
+_color_cache = {}
+
+def _color3d(name):
+    """
+    Look up a named color, caching the result of colors.GetColor3d.
+
+    Parameters:
+    -----------
+    name : str
+        The color name.
+
+    Returns:
+    --------
+    color : vtk.vtkColor3d
+        The RGB color.
+    """
+    color = _color_cache.get(name)
+    if color is None:
+        color = colors.GetColor3d(name)
+        _color_cache[name] = color
+    return color
+
 def vtk_read_volume_from_file(file_name):
     """
     Read a volume dataset from a file using VTK.
@@ -53,7 +99,7 @@ def vtk_read_volume_from_file(file_name):
     volume = reader.GetOutput()
     return volume, reader
 
-def vtk_structured_point_value_array(reader):
+def vtk_structured_point_value_array(reader, as_volume=False):
     """
     Extract the scalar values from a VTK structured points dataset.
 
@@ -61,54 +107,37 @@ def vtk_structured_point_value_array(reader):
     -----------
     reader : vtk.vtkStructuredPointsReader
         The VTK reader object containing the structured points dataset.
+    as_volume : bool, optional
+        If True, return the values as a 3D array indexed [z, y, x] instead of a flat array.
 
     Returns:
     --------
     arr_value : numpy.ndarray
         An array containing the scalar values extracted from the dataset.
+        This is a view on the dataset's scalar array, not a copy.
     dims : tuple
         A tuple containing the dimensions of the structured points dataset.
     """
     reader_output = reader.GetOutput()
     dims = reader_output.GetDimensions()
 
-    array_values = []
-
-    # Print the values for all structured points
-    for z in range(dims[2]):
-        for y in range(dims[1]):
-            for x in range(dims[0]):
-                idx = x + dims[0] * (y + dims[1] * z)
-                value = reader_output.GetScalarComponentAsFloat(x, y, z, 0)
-                array_values.append(value)
-    arr_value = np.array(array_values)
+    arr_value = numpy_support.vtk_to_numpy(reader_output.GetPointData().GetScalars())
+    if as_volume:
+        arr_value = arr_value.reshape(dims[::-1])
 
     return arr_value, dims
 
     """
     In VTK, the data in a vtkStructuredPoints object is stored in a 1D array, 
-    but it represents a 3D volume. To access the values of individual structured points in the 3D volume, 
-    you need to map their 3D coordinates (x, y, z) to a linear index in the 1D array.
-
-    Here's how it works:
+    but it represents a 3D volume. The point (x, y, z) is stored at the linear index
 
-        x, y, and z are the indices of a structured point in the X, Y, and Z dimensions, respectively.
-        dims[0], dims[1], and dims[2] are the dimensions of the structured points in the X, Y, and Z directions, respectively.
+        idx = x + dims[0] * (y + dims[1] * z)
 
-    The calculation for the linear index is as follows:
+    i.e. x varies fastest and z slowest. The flat scalar array therefore already is the
+    array of values in that order, and no per-point access is needed to build it.
 
-        - We start with the x index, which represents the column number in the 2D slice of the volume. 
-        We don't need to adjust this index.
-        
-        - We then move to the y index, which represents the row number in the 2D slice. 
-        To account for this, we multiply the y index by the number of columns (dims[0]) in a single slice and add it to the result.
-        
-        - Finally, we move to the z index, which represents the slice number along the Z direction.
-        To account for this, we multiply the z index by the number of elements (dims[0] * dims[1]) in a single slice, 
-        and then add it to the result.
-
-    In the end, idx represents the linear index of the structured point in the 1D array that contains the data of the entire 3D volume. 
-    By using this index, we can access the value of the structured point in the array using uncertainty.GetScalarComponentAsFloat(x, y, z, 0).
+    Reshaping the flat array to dims[::-1] (C order) gives a 3D view indexed as [z, y, x],
+    which matches this layout without copying or permuting axes.
     """
 
 def vtk_create_interactor_style(interactor):
@@ -187,7 +216,7 @@ def vtk_create_actor(mapper, color):
     """
     actor = vtk.vtkActor()
     actor.SetMapper(mapper)
-    actor.GetProperty().SetColor(colors.GetColor3d(color))
+    actor.GetProperty().SetColor(_color3d(color))
     actor.SetVisibility(True)
     return actor
 
@@ -206,7 +235,7 @@ def vtk_create_context_view(color):
         The context view object.
     """
     view = vtk.vtkContextView()
-    view.GetRenderer().SetBackground(colors.GetColor3d(color))
+    view.GetRenderer().SetBackground(_color3d(color))
     view.GetRenderWindow().SetSize(400,400)
     return view
 
@@ -247,6 +276,38 @@ def vtk_create_float_array(column_name):
     arr.SetName(column_name)
     return arr
 
+def vtk_float_array_from_numpy(column_name, arr, deep=False):
+    """
+    Create a float array with the given column name from a NumPy array.
+
+    Parameters:
+    -----------
+    column_name : str
+        The name of the column for the float array.
+    arr : array_like
+        The values of the float array.
+    deep : bool, optional
+        If True, copy the values into VTK-owned memory. Otherwise the float array shares
+        memory with the (float32, contiguous) NumPy array.
+
+    Returns:
+    --------
+    arr_vtk : vtk.vtkFloatArray
+        The float array object.
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.float32)
+    if deep:
+        # Fill VTK-owned memory directly, this also works for read-only arrays
+        arr_vtk = vtk.vtkFloatArray()
+        arr_vtk.SetNumberOfTuples(arr.size)
+        numpy_support.vtk_to_numpy(arr_vtk)[:] = arr.ravel()
+    else:
+        arr_vtk = numpy_support.numpy_to_vtk(arr, deep=False, array_type=vtk.VTK_FLOAT)
+        # Keep the NumPy buffer alive for as long as VTK may read from it
+        arr_vtk._np_ref = arr
+    arr_vtk.SetName(column_name)
+    return arr_vtk
+
 def vtk_create_points(chart, table):
     """
     Create points plot and add it to the chart.
@@ -285,8 +346,8 @@ def vtk_create_piecewise_function(*args):
         The created opacity transfer function.
     """
     opacityTransferFunction = vtk.vtkPiecewiseFunction()
-    for i in range(len(args[0])):
-        opacityTransferFunction.AddPoint(args[0][i][0], args[0][i][1])
+    nodes = np.ascontiguousarray(args[0], dtype=np.float64).ravel()
+    opacityTransferFunction.FillFromDataPointer(len(args[0]), nodes)
     return opacityTransferFunction
 
 def vtk_create_color_transfer_function(*args):
@@ -309,8 +370,8 @@ def vtk_create_color_transfer_function(*args):
     """
     alphaTransferFunction = vtk.vtkColorTransferFunction()
     if args[0] == "RGB":
-        for i in range(len(args[1])):
-            alphaTransferFunction.AddRGBPoint(args[1][i][0], args[1][i][1], args[1][i][2], args[1][i][3])
+        nodes = np.ascontiguousarray(args[1], dtype=np.float64).ravel()
+        alphaTransferFunction.FillFromDataPointer(len(args[1]), nodes)
     elif args[0] == "HSV":
             alphaTransferFunction.AddHSVSegment(args[1][0], args[1][1], args[1][2], args[1][3],
                                                 args[1][4], args[1][5], args[1][6], args[1][7])
@@ -393,13 +454,12 @@ def vtk_create_renderer(*args):
         The created renderer for visualization.
     """
     renderer = vtk.vtkRenderer()
-    for i in range(len(args)):
-        # renderer.AddVolume(args[i])
-        try:
-            renderer.AddVolume(args[i])
-        except TypeError:
-            renderer.AddActor(args[i])
-    renderer.SetBackground(colors.GetColor3d('White'))
+    for arg in args:
+        if isinstance(arg, vtk.vtkVolume):
+            renderer.AddVolume(arg)
+        else:
+            renderer.AddActor(arg)
+    renderer.SetBackground(_color3d('White'))
     return renderer
 
 def vtk_create_outline(reader):
@@ -423,7 +483,7 @@ def vtk_create_outline(reader):
 
     actorOutline = vtk.vtkActor()
     actorOutline.SetMapper(mapperOutline)
-    actorOutline.GetProperty().SetColor(colors.GetColor3d('Black'))
+    actorOutline.GetProperty().SetColor(_color3d('Black'))
     return actorOutline
 
 def vtk_create_scalar_bar(tf_uncertainty, interactor, title):
@@ -469,6 +529,83 @@ def vtk_create_scalar_bar(tf_uncertainty, interactor, title):
     scalar_bar_widget.On()
     return scalar_bar, scalar_bar_widget
 
+# Semi-transparent bar color (RGBA) of the histograms in the chart background
+_histogram_color_series = vtk.vtkColorSeries()
+_histogram_color_series.SetColorScheme(vtk.vtkColorSeries.BREWER_SEQUENTIAL_BLUE_GREEN_3)
+_histogram_color = _histogram_color_series.GetColor(0)
+_HISTOGRAM_BAR_RGBA = (_histogram_color.GetRed(), _histogram_color.GetGreen(), _histogram_color.GetBlue(), 10)
+
+def _build_tf_chart(title, x_axis_title, y_axis_title, table, transfer_function=False, ticks=None):
+    """
+    Build a chart with a histogram bar plot, shared by the transfer function and histogram charts.
+
+    Parameters:
+    -----------
+    title : str
+        Title of the chart.
+    x_axis_title : str
+        Title of the x-axis.
+    y_axis_title : str
+        Title of the y-axis.
+    table : vtk.vtkTable
+        Table with the histogram ("Index", "Value") of the bar plot.
+    transfer_function : bool, optional
+        If True, a transfer function item and its control points are added below the bar plot.
+    ticks : tuple, optional
+        Custom tick positions and labels (vtkDoubleArray, vtkStringArray) of the x-axis,
+        which is then fixed to [0, 1].
+
+    Returns:
+    --------
+    view : vtk.vtkContextView
+        VTK context view.
+    chart : vtk.vtkChartXY
+        VTK chart object.
+    item : vtk.vtkCompositeTransferFunctionItem
+        Transfer function item of the chart, None if transfer_function is False.
+    control_points : vtk.vtkCompositeControlPointsItem
+        Control points of the transfer function, None if transfer_function is False.
+    line : vtk.vtkPlotBar
+        Histogram bar plot.
+    """
+    view = vtk.vtkContextView()
+    view.GetRenderer().SetBackground(1.0, 1.0, 1.0)
+    view.GetRenderWindow().SetMultiSamples(0)
+
+    chart = vtk.vtkChartXY()
+    chart.SetTitle(title)
+    chart.GetAxis(0).SetTitle(x_axis_title)
+    chart.GetAxis(1).SetTitle(y_axis_title)
+    chart.ForceAxesToBoundsOn()
+    view.GetScene().AddItem(chart)
+
+    item = None
+    control_points = None
+    if transfer_function:
+        item = vtk.vtkCompositeTransferFunctionItem()
+        item.SetMaskAboveCurve(True)
+        chart.AddPlot(item)
+
+        control_points = vtk.vtkCompositeControlPointsItem()
+        chart.AddPlot(control_points)
+
+    line = chart.AddPlot(vtk.vtkChart.BAR)
+    line.SetColor(*_HISTOGRAM_BAR_RGBA)
+    line.SetInputData(table, 0, 1)
+
+    if ticks is not None:
+        xAxis = chart.GetAxis(vtk.vtkAxis.BOTTOM)
+        xAxis.SetRange(0.0, 1.0)
+        xAxis.SetCustomTickPositions(*ticks)
+        xAxis.SetMinimumLimit(0.0)
+        xAxis.SetMaximumLimit(1.0)
+        xAxis.RecalculateTickSpacing()
+
+    yAxis = chart.GetAxis(vtk.vtkAxis.LEFT)
+    yAxis.SetBehavior(vtk.vtkAxis.FIXED)
+
+    return view, chart, item, control_points, line
+
 def vtk_create_transfer_function(title, x_axis_title, y_axis_title, color_tf, opacity_tf, data):
     """
     Create a transfer function visualization.
@@ -492,70 +629,119 @@ def vtk_create_transfer_function(title, x_axis_title, y_axis_title, color_tf, op
     --------
     view : vtk.vtkContextView
         Context view for the transfer function.
+    chart : vtk.vtkChartXY
+        VTK chart object.
+    item : vtk.vtkCompositeTransferFunctionItem
+        Transfer function item of the chart.
+    control_points : vtk.vtkCompositeControlPointsItem
+        Control points of the transfer function.
+    line : vtk.vtkPlotBar
+        Histogram bar plot.
     """
-    view = vtk.vtkContextView()
-    view.GetRenderer().SetBackground(1.0, 1.0, 1.0)
-    view.GetRenderWindow().SetMultiSamples(0)
+    table = vtk_create_table(data)
 
-    chart = vtk.vtkChartXY()
-    chart.SetTitle(title)
-    chart.GetAxis(0).SetTitle(x_axis_title)
-    chart.GetAxis(1).SetTitle(y_axis_title)
-    chart.ForceAxesToBoundsOn()
-    view.GetScene().AddItem(chart)
+    view, chart, item, control_points, line = _build_tf_chart(
+        title, x_axis_title, y_axis_title, table, transfer_function=True)
 
-    item = vtk.vtkCompositeTransferFunctionItem()
     item.SetColorTransferFunction(color_tf)
     item.SetOpacityFunction(opacity_tf)
-    item.SetMaskAboveCurve(True)
-    chart.AddPlot(item)
-
-    control_points = vtk.vtkCompositeControlPointsItem()
     control_points.SetColorTransferFunction(color_tf)
     control_points.SetOpacityFunction(opacity_tf)
-    chart.AddPlot(control_points)
 
+    return view, chart, item, control_points, line
 
-    color_series = vtk.vtkColorSeries()
-    color_series.SetColorScheme(vtk.vtkColorSeries.BREWER_SEQUENTIAL_BLUE_GREEN_3)
+@functools.lru_cache(maxsize=16)
+def _make_index(num_row):
+    """
+    Return the normalized row index (1/n, 2/n, ..., 1) used as x-values of the chart tables.
 
-    color = color_series.GetColor(0)
-    alpha = 10   # opacity
-    semi_transparent_color = vtk.vtkColor4ub(color.GetRed(), color.GetGreen(), color.GetBlue(), int(alpha))
+    Parameters:
+    -----------
+    num_row : int
+        Number of rows.
 
-    # Create a table with some points in it...
-    table = vtk.vtkTable()
+    Returns:
+    --------
+    index : numpy.ndarray
+        Read-only float32 array of length num_row, shared between callers.
+    """
+    index = np.arange(1, num_row + 1, dtype=np.float32) / np.float32(num_row)
+    index.flags.writeable = False
+    return index
 
-    arr_index = vtk.vtkFloatArray()
-    arr_index.SetName("Index")
-    table.AddColumn(arr_index)
-    
-    arr_value = vtk.vtkFloatArray()
-    arr_value.SetName("Value")
-    table.AddColumn(arr_value)
+class _TableCache:
+    """
+    Two-column ("Index", "Value") VTK table whose columns alias NumPy buffers.
 
-    table.SetNumberOfRows(len(data))
-    num_row = len(data)
-    for i in range(num_row):
-        table.SetValue(i, 0, (i + 1)/num_row)
-        table.SetValue(i, 1, data[i])
-    
-    line = chart.AddPlot(vtk.vtkChart.BAR)
-    # line.SetColor(color_series.GetColor(0).GetRed() / 255.0,
-    #           color_series.GetColor(0).GetGreen() / 255.0,
-    #           color_series.GetColor(0).GetBlue() / 255.0)
-    line.SetColor(semi_transparent_color.GetRed(),
-            semi_transparent_color.GetGreen(),
-            semi_transparent_color.GetBlue(),
-            semi_transparent_color.GetAlpha())
-    line.SetInputData(table, 0, 1)
+    Parameters:
+    -----------
+    num_row : int
+        Number of rows of the table.
 
-    yAxis = chart.GetAxis(vtk.vtkAxis.LEFT)
-    yAxis.SetBehavior(vtk.vtkAxis.FIXED)
+    Attributes:
+    -----------
+    table : vtk.vtkTable
+        The cached VTK table.
+    idx_arr : numpy.ndarray
+        Shared, read-only values of the "Index" column (see _make_index).
+    val_arr : numpy.ndarray
+        Buffer backing the "Value" column.
+    vtk_idx : vtk.vtkFloatArray
+        VTK wrapper around idx_arr.
+    vtk_val : vtk.vtkFloatArray
+        VTK wrapper around val_arr.
+    """
+    def __init__(self, num_row):
+        self.idx_arr = _make_index(num_row)
+        self.val_arr = np.zeros(num_row, dtype=np.float32)
+
+        # The index is copied since the cached array is shared, the values share memory with val_arr
+        self.vtk_idx = vtk_float_array_from_numpy("Index", self.idx_arr, deep=True)
+        self.vtk_val = vtk_float_array_from_numpy("Value", self.val_arr)
+
+        self.table = vtk.vtkTable()
+        self.table.AddColumn(self.vtk_idx)
+        self.table.AddColumn(self.vtk_val)
+
+    def update(self, data):
+        """
+        Overwrite the "Value" column in place.
+
+        Parameters:
+        -----------
+        data : list or np.ndarray
+            New values, one per row.
+        """
+        self.val_arr[:] = data
+        self.vtk_val.Modified()
+        self.table.Modified()
+
+_table_caches = {}
+
+def vtk_get_table_cache(owner, num_row):
+    """
+    Get the table cache of a chart item for a given number of rows.
 
-    return view, chart, item, control_points, line
+    Parameters:
+    -----------
+    owner : vtk.vtkObject
+        The chart or plot the table is displayed in.
+    num_row : int
+        Number of rows of the table.
+
+    Returns:
+    --------
+    cache : _TableCache
+        The table cache, created on first use and reused afterwards.
+    """
+    key = (id(owner), num_row)
+    cache = _table_caches.get(key)
+    if cache is None:
+        cache = _TableCache(num_row)
+        _table_caches[key] = cache
+    return cache
 
-def vtk_create_table(data):
+def vtk_create_table(data, cache=None):
     """
     Create a VTK table from input data.
 
@@ -563,30 +749,26 @@ def vtk_create_table(data):
     -----------
     data : list or np.ndarray
         Input data for creating the table.
+    cache : _TableCache, optional
+        If given (see vtk_get_table_cache), its table is updated in place and returned
+        instead of building a new one.
 
     Returns:
     --------
     table : vtk.vtkTable
         VTK table containing the input data.
     """
+    if cache is not None:
+        cache.update(data)
+        return cache.table
+
+    num_row = len(data)
+    arr_index = vtk_float_array_from_numpy("Index", _make_index(num_row), deep=True)
+    arr_value = vtk_float_array_from_numpy("Value", data, deep=True)
+
     table = vtk.vtkTable()
-        
-    arr_index = vtk.vtkFloatArray()
-    arr_index.SetName("Index")
-    table.AddColumn(arr_index)
-    
-    arr_value = vtk.vtkFloatArray()
-    arr_value.SetName("Value")
-    table.AddColumn(arr_value)
-    
     table.AddColumn(arr_index)
     table.AddColumn(arr_value)
-    
-    table.SetNumberOfRows(len(data))
-    num_row = len(data)
-    for i in range(num_row):
-        table.SetValue(i, 0, (i + 1) / num_row)
-        table.SetValue(i, 1, data[i])
 
     return table
 
@@ -677,6 +859,32 @@ def vtk_create_plane_widget(interactor):
     plane_widget.On()
     return plane_widget
 
+def _tick_arrays(ticks_position):
+    """
+    Build the position and label arrays for custom axis ticks.
+
+    Parameters:
+    -----------
+    ticks_position : sequence of float
+        The tick positions.
+
+    Returns:
+    --------
+    x_tick_position : vtk.vtkDoubleArray
+        The tick positions.
+    x_tick_label : vtk.vtkStringArray
+        The tick labels.
+    """
+    x_tick_position = vtk.vtkDoubleArray()
+    x_tick_label = vtk.vtkStringArray()
+    for value in ticks_position:
+        x_tick_position.InsertNextValue(value)
+        x_tick_label.InsertNextValue(str(value))
+    return x_tick_position, x_tick_label
+
+# vtkAxis.SetCustomTickPositions copies the arrays, so they can be shared by all charts
+_TICK_POS, _TICK_LABEL = _tick_arrays((0.0, 0.2, 0.4, 0.6, 0.8, 1.0))
+
 def vtk_create_histogram(title, x_axis_title, y_axis_title, data, isosurface):
     """
     Create a histogram using VTK.
@@ -705,88 +913,14 @@ def vtk_create_histogram(title, x_axis_title, y_axis_title, data, isosurface):
     vertical_line : vtk.vtkPlotLine
         VTK line plot object representing the vertical line at the specified isosurface value.
     """
-    view = vtk.vtkContextView()
-    view.GetRenderer().SetBackground(1.0, 1.0, 1.0)
-    view.GetRenderWindow().SetMultiSamples(0)
-
-    chart = vtk.vtkChartXY()
-    chart.SetTitle(title)
-    chart.GetAxis(0).SetTitle(x_axis_title)
-    chart.GetAxis(1).SetTitle(y_axis_title)
-    chart.ForceAxesToBoundsOn()
-    view.GetScene().AddItem(chart)
-
-    color_series = vtk.vtkColorSeries()
-    color_series.SetColorScheme(vtk.vtkColorSeries.BREWER_SEQUENTIAL_BLUE_GREEN_3)
-
-    color = color_series.GetColor(0)
-    alpha = 10   # opacity
-    semi_transparent_color = vtk.vtkColor4ub(color.GetRed(), color.GetGreen(), color.GetBlue(), int(alpha))
-
     # Create a table with some points in it...
-    table = vtk.vtkTable()
+    table = vtk_create_table(data)
 
-    arr_index = vtk.vtkFloatArray()
-    arr_index.SetName("Index")
-    table.AddColumn(arr_index)
-    
-    arr_value = vtk.vtkFloatArray()
-    arr_value.SetName("Value")
-    table.AddColumn(arr_value)
+    view, chart, _, _, line = _build_tf_chart(title, x_axis_title, y_axis_title, table,
+                                              ticks=(_TICK_POS, _TICK_LABEL))
 
-    table.SetNumberOfRows(len(data))
-    num_row = len(data)
-    for i in range(num_row):
-        table.SetValue(i, 0, (i + 1)/num_row)
-        table.SetValue(i, 1, data[i])
-    
-    line = chart.AddPlot(vtk.vtkChart.BAR)
-    # line.SetColor(color_series.GetColor(0).GetRed() / 255.0,
-    #           color_series.GetColor(0).GetGreen() / 255.0,
-    #           color_series.GetColor(0).GetBlue() / 255.0)
-    line.SetColor(semi_transparent_color.GetRed(),
-            semi_transparent_color.GetGreen(),
-            semi_transparent_color.GetBlue(),
-            semi_transparent_color.GetAlpha())
-    line.SetInputData(table, 0, 1)
-
-    # Set custom tick positions
-    ticks_position = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
-    x_tick_position = vtk.vtkDoubleArray()
-    x_tick_label = vtk.vtkStringArray()
-    for i, value in enumerate(ticks_position):
-        x_tick_position.InsertNextValue(value)
-        x_tick_label.InsertNextValue(str(value))
-    
-    # ticks_label = [str(tick) for tick in ticks_position]
-
-    xAxis = chart.GetAxis(vtk.vtkAxis.BOTTOM)
-    xAxis.SetRange(0.0, 1.0)
-    xAxis.SetCustomTickPositions(x_tick_position, x_tick_label)
-    # xAxis.SetNumberOfTicks(2)
-    xAxis.SetMinimumLimit(0.0)
-    xAxis.SetMaximumLimit(1.0)
-    xAxis.RecalculateTickSpacing()
-
-    yAxis = chart.GetAxis(vtk.vtkAxis.LEFT)
-    yAxis.SetBehavior(vtk.vtkAxis.FIXED)
-
-    # Add a vertical line at position 0.90
-    table_vertical_line_points = vtk.vtkTable()
-    
-    vertical_line_points_index = vtk.vtkFloatArray()
-    vertical_line_points_index.SetName("Index")
-    table_vertical_line_points.AddColumn(vertical_line_points_index)
-
-    vertical_line_points_value = vtk.vtkFloatArray()
-    vertical_line_points_value.SetName("Value")
-    table_vertical_line_points.AddColumn(vertical_line_points_value)
-    
-    table_vertical_line_points.SetNumberOfRows(2)
-    table_vertical_line_points.SetValue(0, 0, isosurface)
-    table_vertical_line_points.SetValue(0, 1, 0.0)
-    table_vertical_line_points.SetValue(1, 0, isosurface)
-    table_vertical_line_points.SetValue(1, 1, 1.0)
+    # Add a vertical line at the isosurface value
+    table_vertical_line_points = vtk_create_vertical_line_table(line=True, isosurface=isosurface)
 
     vertical_line = chart.AddPlot(vtk.vtkChart.LINE)
     vertical_line.SetInputData(table_vertical_line_points, 0, 1)
@@ -798,7 +932,7 @@ def vtk_create_histogram(title, x_axis_title, y_axis_title, data, isosurface):
 
     return view, chart, line, vertical_line
 
-def vtk_create_vertical_line_table(line=True):
+def vtk_create_vertical_line_table(line=True, isosurface=0.90):
     """
     Create a VTK table containing points for a vertical line.
 
@@ -806,38 +940,83 @@ def vtk_create_vertical_line_table(line=True):
     -----------
     line : bool, optional
         If True, creates a line spanning the entire y-axis range. If False, creates a single point at y=0.
+    isosurface : float, optional
+        The x-position of the vertical line.
 
     Returns:
     --------
     table_vertical_line_points : vtk.vtkTable
         VTK table containing the points for the vertical line.
     """
+    points = np.array([[isosurface, 0.0], [isosurface, 1.0 if line else 0.0]], dtype=np.float32)
+
     table_vertical_line_points = vtk.vtkTable()
-    
-    vertical_line_points_index = vtk.vtkFloatArray()
-    vertical_line_points_index.SetName("Index")
-    table_vertical_line_points.AddColumn(vertical_line_points_index)
-
-    vertical_line_points_value = vtk.vtkFloatArray()
-    vertical_line_points_value.SetName("Value")
-    table_vertical_line_points.AddColumn(vertical_line_points_value)
-
-    if line:
-        table_vertical_line_points.SetNumberOfRows(2)
-        table_vertical_line_points.SetValue(0, 0, 0.90)
-        table_vertical_line_points.SetValue(0, 1, 0.0)
-        table_vertical_line_points.SetValue(1, 0, 0.90)
-        table_vertical_line_points.SetValue(1, 1, 1.0)
-    else:
-        table_vertical_line_points.SetNumberOfRows(2)
-        table_vertical_line_points.SetValue(0, 0, 0.90)
-        table_vertical_line_points.SetValue(0, 1, 0.0)
-        table_vertical_line_points.SetValue(1, 0, 0.90)
-        table_vertical_line_points.SetValue(1, 1, 0.0)
-    
+    table_vertical_line_points.AddColumn(vtk_float_array_from_numpy("Index", points[:, 0]))
+    table_vertical_line_points.AddColumn(vtk_float_array_from_numpy("Value", points[:, 1]))
+
     return table_vertical_line_points
 
-def create_histogram_array(data, num_bins, filter=False, filter_threshold=0.01):
+def vtk_update_vertical_line(table, isosurface, line=True):
+    """
+    Update the points of a vertical line table in place.
+
+    Parameters:
+    -----------
+    table : vtk.vtkTable
+        Table created by vtk_create_vertical_line_table or vtk_create_histogram.
+    isosurface : float
+        The x-position of the vertical line.
+    line : bool, optional
+        If True, the line spans the entire y-axis range. If False, it collapses to a single point at y=0.
+    """
+    arr_index = table.GetColumn(0)
+    arr_index.SetValue(0, isosurface)
+    arr_index.SetValue(1, isosurface)
+    arr_value = table.GetColumn(1)
+    arr_value.SetValue(0, 0.0)
+    arr_value.SetValue(1, 1.0 if line else 0.0)
+    arr_index.Modified()
+    arr_value.Modified()
+    table.Modified()
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _histogram_kernel(data, bin_edges, threshold, use_filter, num_chunks):
+        """
+        Fused filter + binning over [bin_edges[0], bin_edges[-1]] in a single parallel pass, returning the bin counts.
+
+        Each of the num_chunks chunks of the data is binned into its own row of `local`, the rows
+        are summed at the end. num_chunks is passed in (not queried inside) so the kernel can be cached.
+        Values are assigned to the uniform bin_edges as in np.histogram: the bin computed from the
+        value is corrected against the edges, and only the last bin includes its upper edge.
+        """
+        num_bins = bin_edges.size - 1
+        first_edge = bin_edges[0]
+        last_edge = bin_edges[num_bins]
+        chunk_size = (data.size + num_chunks - 1) // num_chunks
+        local = np.zeros((num_chunks, num_bins), np.int64)
+        for c in numba.prange(num_chunks):
+            for i in range(c * chunk_size, min((c + 1) * chunk_size, data.size)):
+                v = data[i]
+                # Written so that NaN fails the range test (no fastmath, which would assume there is no NaN)
+                if not (v >= first_edge and v <= last_edge) or (use_filter and v <= threshold):
+                    continue
+                b = int((v - first_edge) / (last_edge - first_edge) * num_bins)
+                if b == num_bins:
+                    b -= 1
+                if v < bin_edges[b]:
+                    b -= 1
+                elif b != num_bins - 1 and v >= bin_edges[b + 1]:
+                    b += 1
+                local[c, b] += 1
+        return local.sum(axis=0)
+
+    # Compile (or load from the cache) on import rather than on the first histogram update,
+    # for double volumes (as written by the VTK writer) and float volumes
+    _histogram_kernel(np.zeros(1, dtype=np.float64), np.array([0.0, 1.0]), np.float64(0.0), False, 1)
+    _histogram_kernel(np.zeros(1, dtype=np.float32), np.array([0.0, 1.0], dtype=np.float32), np.float32(0.0), False, 1)
+
+def create_histogram_array(data, num_bins, filter=False, filter_threshold=0.01, dtype=np.float32, out=None):
     """
     Create a normalized histogram array from the input data.
 
@@ -851,11 +1030,31 @@ def create_histogram_array(data, num_bins, filter=False, filter_threshold=0.01):
         If True, applies a filter to exclude data points below a certain threshold.
     filter_threshold : float, optional
         Threshold value for the filter.
+    dtype : numpy.dtype, optional
+        Floating point type of the returned array. Ignored if out is given.
+    out : numpy.ndarray, optional
+        Preallocated array of length num_bins the normalized histogram is written to.
 
     Returns:
     --------
     hist_norm : numpy.ndarray
-        Normalized histogram array.
+        Normalized histogram array, with values in [0, 1]. This is out if it was given.
+    """
+    if numba is not None:
+        # Same edges (and edge type) as np.histogram, the threshold is compared in that type as well
+        bin_edges = np.histogram_bin_edges(data, bins=num_bins, range=(0.0, 1.0))
+        threshold = bin_edges.dtype.type(filter_threshold)
+        hist = _histogram_kernel(np.ravel(data), bin_edges, threshold, filter, numba.get_num_threads())
+    else:
+        hist = _histogram_numpy(data, num_bins, filter, filter_threshold)
+
+    if out is None:
+        out = np.empty(num_bins, dtype=dtype)
+    return np.multiply(hist, 1.0 / hist.max(), out=out, casting='unsafe')
+
+def _histogram_numpy(data, num_bins, filter, filter_threshold):
+    """
+    Bin counts of the data over [0, 1], NumPy implementation of _histogram_kernel.
     """
     if filter:
         mask = data <= filter_threshold
@@ -864,8 +1063,7 @@ def create_histogram_array(data, num_bins, filter=False, filter_threshold=0.01):
         hist, bin_edges = np.histogram(filtered_data, bins=num_bins, density=False, range=(0.0, 1.0))
     else:
         hist, bin_edges = np.histogram(data, bins=num_bins, density=False, range=(0.0, 1.0))
-    hist_norm = hist / np.max(hist)
-    return hist_norm
+    return hist
 
 def vtk_resize_render_window(frame, interactor):
     """
@@ -898,6 +1096,36 @@ def heatmap_onpick(event):
     else:
         print("Clicked outside the heatmap.")
 
+@dataclass
+class CameraState:
+    """
+    Camera parameters saved by vtk_get_orientation and restored by vtk_set_orientation.
+
+    Attributes:
+    -----------
+    position : tuple
+        The position of the camera.
+    focal_point : tuple
+        The focal point of the camera.
+    view_up : tuple
+        The up direction of the camera.
+    distance : float
+        The distance of the camera from the focal point.
+    clipping_range : tuple
+        The clipping range of the camera.
+    orientation : tuple
+        The orientation of the camera.
+    """
+    # Declared by hand since dataclass(slots=True) needs Python 3.10
+    __slots__ = ('position', 'focal_point', 'view_up', 'distance', 'clipping_range', 'orientation')
+
+    position: tuple
+    focal_point: tuple
+    view_up: tuple
+    distance: float
+    clipping_range: tuple
+    orientation: tuple
+
 def vtk_get_orientation(ren):
     """
     Get the camera orientation.
@@ -909,24 +1137,16 @@ def vtk_get_orientation(ren):
 
     Returns:
     --------
-    dict
-        A dictionary containing the orientation parameters:
-        - 'position': The position of the camera.
-        - 'focal point': The focal point of the camera.
-        - 'view up': The up direction of the camera.
-        - 'distance': The distance of the camera from the focal point.
-        - 'clipping range': The clipping range of the camera.
-        - 'orientation': The orientation of the camera.
-    """
-    p = dict()
+    CameraState
+        The position, focal point, view up, distance, clipping range and orientation of the camera.
+    """
     camera = ren.GetActiveCamera()
-    p['position'] = camera.GetPosition()
-    p['focal point'] = camera.GetFocalPoint()
-    p['view up'] = camera.GetViewUp()
-    p['distance'] = camera.GetDistance()
-    p['clipping range'] = camera.GetClippingRange()
-    p['orientation'] = camera.GetOrientation()
-    return p
+    return CameraState(camera.GetPosition(),
+                       camera.GetFocalPoint(),
+                       camera.GetViewUp(),
+                       camera.GetDistance(),
+                       camera.GetClippingRange(),
+                       camera.GetOrientation())
 
 def vtk_set_orientation(ren, p):
     """
@@ -936,26 +1156,27 @@ def vtk_set_orientation(ren, p):
     -----------
     ren : vtkRenderer
         The renderer.
-    p : dict
-        A dictionary containing the orientation parameters:
-        - 'position': The position of the camera.
-        - 'focal point': The focal point of the camera.
-        - 'view up': The up direction of the camera.
-        - 'distance': The distance of the camera from the focal point.
-        - 'clipping range': The clipping range of the camera.
+    p : CameraState
+        The camera parameters, as returned by vtk_get_orientation.
 
     Returns:
     --------
     None
     """
     camera = ren.GetActiveCamera()
-    camera.SetPosition(p['position'])
-    camera.SetFocalPoint(p['focal point'])
-    camera.SetViewUp(p['view up'])
-    camera.SetDistance(p['distance'])
-    camera.SetClippingRange(p['clipping range'])
+    camera.SetPosition(p.position)
+    camera.SetFocalPoint(p.focal_point)
+    camera.SetViewUp(p.view_up)
+    camera.SetDistance(p.distance)
+    camera.SetClippingRange(p.clipping_range)
 
-def mean_standard_deviation(azimuth_len, elevation_len, render_window):
+# Images with more pixels than this are reduced on the GPU (if CuPy is available)
+_CUPY_MIN_PIXELS = 4000000
+
+# Window-to-image filters reused by mean_standard_deviation, one per render window
+_window_to_image_filters = weakref.WeakKeyDictionary()
+
+def mean_standard_deviation(azimuth_len, elevation_len, render_window, w2i=None, stride=1):
     """
     Calculate the mean and standard deviation of pixel values in the render window.
 
@@ -967,6 +1188,11 @@ def mean_standard_deviation(azimuth_len, elevation_len, render_window):
         Length of elevation.
     render_window : vtkRenderWindow
         The render window to extract pixel values from.
+    w2i : vtkWindowToImageFilter, optional
+        Window-to-image filter reading from render_window. If None, a filter created on the
+        first call for this render window is reused.
+    stride : int, optional
+        Only every stride-th pixel along each image axis is used for the statistics.
 
     Returns:
     --------
@@ -975,28 +1201,74 @@ def mean_standard_deviation(azimuth_len, elevation_len, render_window):
     standard_deviation : float
         The standard deviation of pixel values.
     """
-    # Create a window-to-image filter
-    window_to_image_filter = vtk.vtkWindowToImageFilter()
-    window_to_image_filter.SetInput(render_window)
-    window_to_image_filter.Update()
+    if w2i is None:
+        w2i = _window_to_image_filters.get(render_window)
+        if w2i is None:
+            w2i = vtk.vtkWindowToImageFilter()
+            w2i.SetInput(render_window)
+            _window_to_image_filters[render_window] = w2i
+
+    # Grab the current frame
+    w2i.Modified()
+    w2i.Update()
 
     # Get the image data
-    image_data = window_to_image_filter.GetOutput()
+    image_data = w2i.GetOutput()
 
     width, height, _ = image_data.GetDimensions()
 
-    # Access pixel data
-    arr_pixel_value = []
-    for y in range(height):
-        for x in range(width):
-            pixel_value = image_data.GetScalarComponentAsFloat(x, y, 0, 0)
-            arr_pixel_value.append(pixel_value)
-    np_arr_pixel_value = np.array(arr_pixel_value) / 255.0
-    mean = np.mean(np_arr_pixel_value)
-    standard_deviation = np.std(np_arr_pixel_value)
+    # Access pixel data, first component only. vtk_to_numpy wraps the contiguous scalar
+    # array of the image without copying, so the reductions below read VTK-owned memory
+    # (image_data stays referenced until they are done).
+    raw = numpy_support.vtk_to_numpy(image_data.GetPointData().GetScalars())
+    raw = raw.reshape(height, width, -1)
+    if stride > 1:
+        raw = raw[::stride, ::stride]
+
+    if cupy is not None and raw.shape[0] * raw.shape[1] > _CUPY_MIN_PIXELS:
+        # Large images: copy the first component to the device and reduce there
+        try:
+            pixel_value = cupy.asarray(np.ascontiguousarray(raw[..., 0])).astype(cupy.float32) * (1.0 / 255.0)
+            return float(pixel_value.mean()), float(pixel_value.std())
+        except RuntimeError:
+            # No usable CUDA device (CUDARuntimeError/CUDADriverError), reduce on the CPU instead
+            pass
+
+    if cv2 is not None:
+        # Per-channel statistics in one pass over the uint8 image, scaled afterwards
+        channel_means, channel_stddevs = cv2.meanStdDev(np.ascontiguousarray(raw))
+        return float(channel_means[0, 0]) / 255.0, float(channel_stddevs[0, 0]) / 255.0
+
+    raw = raw[..., 0]
+    # Scale while casting to float32, in a single pass over the pixels
+    np_arr_pixel_value = np.multiply(raw, 1.0 / 255.0, dtype=np.float32)
+    # Accumulate in float32: pairwise summation keeps 8-bit pixel statistics accurate to
+    # about 6 decimals, float64 accumulation would double the memory traffic
+    mean = np_arr_pixel_value.mean(dtype=np.float32)
+    standard_deviation = np_arr_pixel_value.std(dtype=np.float32)
 
     return mean, standard_deviation
 
+def _make_valid_mask(num_row, name="ValidMask"):
+    """
+    Create a valid-point mask column marking all rows as valid.
+
+    Parameters:
+    -----------
+    num_row : int
+        Number of rows.
+    name : str, optional
+        Name of the mask array.
+
+    Returns:
+    --------
+    valid_mask : vtk.vtkCharArray
+        Char array of length num_row filled with 1.
+    """
+    valid_mask = numpy_support.numpy_to_vtk(np.ones(num_row, dtype=np.int8), deep=True, array_type=vtk.VTK_CHAR)
+    valid_mask.SetName(name)
+    return valid_mask
+
 def vtk_create_rectangle(chart, data):
     """
     Create a rectangle plot on a VTK chart.
@@ -1014,49 +1286,20 @@ def vtk_create_rectangle(chart, data):
         The created rectangle plot.
     """
     table = vtk.vtkTable()
+    table.AddColumn(vtk_float_array_from_numpy("X Axis", [data[0], np.mean(data), data[1]], deep=True))
+    table.AddColumn(vtk_float_array_from_numpy("TopLine", np.ones(3, dtype=np.float32), deep=True))
+    table.AddColumn(vtk_float_array_from_numpy("BottomLine", np.zeros(3, dtype=np.float32), deep=True))
 
-    arrX = vtk.vtkFloatArray()
-    arrX.SetName("X Axis")
-    table.AddColumn(arrX)
-
-    arrTop = vtk.vtkFloatArray()
-    arrTop.SetName("TopLine")
-    table.AddColumn(arrTop)
-
-    arrBottom = vtk.vtkFloatArray()
-    arrBottom.SetName("BottomLine")
-    table.AddColumn(arrBottom)
-
-    validMask = vtk.vtkCharArray()
-    validMask.SetName("ValidMask")
-    table.AddColumn(validMask)
-
-    table.SetNumberOfRows(3)
-
-    table.SetValue(0, 0, data[0])
-    table.SetValue(0, 1, 1.0)
-    table.SetValue(0, 2, 0.0)
-    validMask.SetValue(0, '1')
-
-    table.SetValue(1, 0, np.mean(data))
-    table.SetValue(1, 1, 1.0)
-    table.SetValue(1, 2, 0.0)
-    validMask.SetValue(1, '1')
-
-    table.SetValue(2, 0, data[1])
-    table.SetValue(2, 1, 1.0)
-    table.SetValue(2, 2, 0.0)
-    validMask.SetValue(2, '1')
+    table.AddColumn(_make_valid_mask(3))
 
     # Add multiple line plots, setting the colors etc.
-    color3d = vtk.vtkNamedColors().GetColor3d("blue")
     area = chart.AddPlot(vtk.vtkChart.AREA)
     area.SetInputData(table)
     area.SetInputArray(0, "X Axis")
     area.SetInputArray(1, "TopLine")
     area.SetInputArray(2, "BottomLine")
     area.SetValidPointMaskName("ValidMask")
-    area.GetBrush().SetColorF(color3d.GetRed(), color3d.GetGreen(), color3d.GetBlue(), 0.2)
+    area.GetBrush().SetColorF(*_BLUE_RGBA)
 
     return area
 
@@ -1067,19 +1310,18 @@ def shift_heatmap(mat):
     Parameters:
     -----------
     mat : numpy.ndarray
-        The input heatmap matrix.
+        The input heatmap matrix, or a stack of heatmap matrices along the leading axes.
+        The shift is applied to the last two axes.
 
     Returns:
     --------
     mat_shift : numpy.ndarray
-        The shifted heatmap matrix.
-    """
-    x_shift = np.zeros_like(mat)
-    x_shift_ = np.hstack((mat[:, int(np.floor(mat.shape[1]/2)):mat.shape[1]], mat[:, 1:int(np.floor(mat.shape[1]/2))]))
-    x_shift[:, :-1] = x_shift_
-    x_shift[:, -1] = x_shift[:, 0]
-    mat_shift = np.zeros_like(mat)
-    y_shift_ = np.vstack((x_shift[int(np.floor(mat.shape[1]/2)):mat.shape[0], :], x_shift[1:int(np.floor(mat.shape[1]/2)), :]))
-    mat_shift[:-1, :] = y_shift_
-    mat_shift[-1, :] = mat_shift[0, :]
+        The shifted heatmap matrix (or stack of matrices).
+    """
+    # The first and last row/column sample the same angle (0 and 360 degrees), so roll the
+    # unique (n-1) samples and then duplicate the first row/column at the end again
+    mat_shift = np.empty_like(mat)
+    mat_shift[..., :-1, :-1] = np.roll(mat[..., 1:, 1:], (1 - mat.shape[-2]//2, 1 - mat.shape[-1]//2), axis=(-2, -1))
+    mat_shift[..., :-1, -1] = mat_shift[..., :-1, 0]
+    mat_shift[..., -1, :] = mat_shift[..., 0, :]
     return mat_shift
\ No newline at end of file
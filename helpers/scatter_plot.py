@@ -7,6 +7,7 @@ from matplotlib.widgets import LassoSelector
 from matplotlib.widgets import RectangleSelector
 from matplotlib.path import Path
 from matplotlib.figure import Figure
+from matplotlib.colors import ListedColormap
 
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 
@@ -15,7 +16,44 @@ from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget
 # from scipy.stats import kde
 from scipy import stats
 
-import seaborn as sns
+try:
+    from KDEpy import FFTKDE
+except ImportError:
+    FFTKDE = None
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True)
+    def _select_stripe(ys, order, ymin, ymax, state):
+        """
+        Fused y-range test and state update over the x-stripe of a rectangle selection.
+
+        Marks the points of the stripe within [ymin, ymax] as selected (2) and all other points as
+        not selected (1), or all points as idle (0) if none is hit. Returns the selected indices.
+        """
+        state[:] = 1
+        selected = np.empty(ys.shape[0], dtype=order.dtype)
+        count = 0
+        for k in range(ys.shape[0]):
+            if (ys[k] >= ymin) & (ys[k] <= ymax):
+                selected[count] = order[k]
+                state[order[k]] = 2
+                count += 1
+        if count == 0:
+            state[:] = 0
+        return selected[:count]
+
+    # Compile (or load from the cache) on import rather than on the first selection
+    _select_stripe(np.zeros(1, dtype=np.float32), np.zeros(1, dtype=np.intp), 0.0, 1.0, np.zeros(1, dtype=np.uint8))
 
 class ScatterPlot(QVBoxLayout):
     """
@@ -50,6 +88,12 @@ class ScatterPlot(QVBoxLayout):
 
         self.selectInd = selectInd
 
+        # Points sorted by x, so a rectangle selection only has to test y within its x-stripe.
+        # The coordinates are kept as separate contiguous float32 arrays (plot precision is pixel-level).
+        self._xorder = np.argsort(self.data[:, 0], kind='stable')
+        self._xs = np.ascontiguousarray(self.data[self._xorder, 0], dtype=np.float32)
+        self._ys = np.ascontiguousarray(self.data[self._xorder, 1], dtype=np.float32)
+
         self.create_density_plot()
         self.create_scatterplot()
 
@@ -58,13 +102,26 @@ class ScatterPlot(QVBoxLayout):
         Create scatter plot.
         """
         self.selected_ind = []
-        self.scatter_pts = self.ax.scatter(self.data[:, 0], self.data[:, 1], color='magenta', s=20, edgecolor='none', alpha=0.3)
+        # Per-point selection state, mapped to magenta with the alpha of the state:
+        # 0 = nothing selected, 1 = not selected, 2 = selected
+        self._state = np.zeros(len(self.data), dtype=np.uint8)
+        state_cmap = ListedColormap([(1.0, 0.0, 1.0, 0.3), (1.0, 0.0, 1.0, 0.001), (1.0, 0.0, 1.0, 1.0)])
+        self.scatter_pts = self.ax.scatter(self.data[:, 0], self.data[:, 1], c=self._state, cmap=state_cmap, vmin=0, vmax=2, s=20, edgecolor='none')
         
     def create_density_plot(self):
         """
         Create density plot.
         """
-        sns_kde = sns.kdeplot(self.data, ax=self.ax, color='blue', fill=True, legend=False)
+        # Gaussian KDE of the uncertainty values (Scott's rule), evaluated once on a fixed grid
+        if FFTKDE is not None:
+            # Binned FFT convolution on an automatic grid covering the data
+            xs, ys = FFTKDE(kernel='gaussian', bw='scott').fit(self.data[:, 0]).evaluate(1024)
+        else:
+            kde = stats.gaussian_kde(self.data[:, 0])
+            xs = np.linspace(0.0, 1.0, 200)
+            ys = kde(xs)
+        self.ax.fill_between(xs, ys, color='blue', alpha=0.25)
+        self.ax.set_ylabel('Density')
 
     def onselect(self, eclick, erelease):
         """
@@ -83,20 +140,30 @@ class ScatterPlot(QVBoxLayout):
         x1, y1 = eclick.xdata, eclick.ydata
         x2, y2 = erelease.xdata, erelease.ydata
 
-        selected_indices = np.where((self.data[:, 0] >= min(x1, x2)) &
-                                    (self.data[:, 0] <= max(x1, x2)) &
-                                    (self.data[:, 1] >= min(y1, y2)) &
-                                    (self.data[:, 1] <= max(y1, y2)))[0]
-        self.selectInd(selected_indices)
-        
-        if len(selected_indices) > 0:
-            self.alphas = np.where(np.isin(np.arange(len(self.data)), selected_indices), 1.0, 0.001)
+        xmin, xmax = sorted((x1, x2))
+        ymin, ymax = sorted((y1, y2))
+        lo = np.searchsorted(self._xs, xmin, side='left')
+        hi = np.searchsorted(self._xs, xmax, side='right')
+        ys = self._ys[lo:hi]
+        if numba is not None:
+            # Test and state update in a single pass
+            selected_indices = _select_stripe(ys, self._xorder[lo:hi], ymin, ymax, self._state)
         else:
-            self.alphas = np.full(len(self.data), 0.3)
+            if numexpr is not None:
+                # Both bounds in one fused pass, without temporary boolean arrays
+                in_y = numexpr.evaluate("(ys >= ymin) & (ys <= ymax)", local_dict={'ys': ys, 'ymin': ymin, 'ymax': ymax})
+            else:
+                in_y = (ys >= ymin) & (ys <= ymax)
+            selected_indices = self._xorder[lo:hi][in_y]
+
+            if len(selected_indices) > 0:
+                self._state[:] = 1
+                self._state[selected_indices] = 2
+            else:
+                self._state[:] = 0
+
+        self.selectInd(selected_indices)
 
-        self.scatter_pts.set_alpha(self.alphas)
+        self.scatter_pts.set_array(self._state)
 
-        self.canvas.draw_idle()
-        self.canvas.flush_events()
-        self.canvas.draw()
-        self.canvas.flush_events()
\ No newline at end of file
+        self.canvas.draw_idle()
\ No newline at end of file
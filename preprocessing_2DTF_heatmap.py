@@ -10,21 +10,28 @@ from datetime import datetime
 
 from helpers import helpers
 
+try:
+    import joblib
+except ImportError:
+    joblib = None
+
 
 def similarity_vectors(vector1, vector2):
     """
     Calculate the angle in degrees between two vectors.
 
     Parameters:
-        vector1 (numpy.ndarray): First vector.
-        vector2 (numpy.ndarray): Second vector.
+        vector1 (numpy.ndarray): First vector, or array of vectors along the last axis.
+        vector2 (numpy.ndarray): Second vector, or array of vectors along the last axis.
 
     Returns:
         tuple: Angle between the vectors in degrees, cosine similarity.
     """
-    dot_product = np.dot(vector1, vector2)
-    norm_vector1 = np.linalg.norm(vector1)
-    norm_vector2 = np.linalg.norm(vector2)
+    vector1 = np.asarray(vector1)
+    vector2 = np.asarray(vector2)
+    dot_product = np.einsum('...i,...i->...', vector1, vector2)
+    norm_vector1 = np.linalg.norm(vector1, axis=-1)
+    norm_vector2 = np.linalg.norm(vector2, axis=-1)
     cos_similarity = dot_product / (norm_vector1 * norm_vector2)
 
     # Calculate the angle in degrees
@@ -33,45 +40,83 @@ def similarity_vectors(vector1, vector2):
     return angle, cos_similarity
 
 
-def main():
+def rotate_vectors(vectors, axes, angles):
     """
-    Main function to visualize opacity and uncertainty volumes.
+    Rotate vectors about axes through the origin, right-handed like vtkTransform.RotateWXYZ.
 
     Parameters:
-    -----------
-    None
+        vectors (numpy.ndarray): Vectors along the last axis.
+        axes (numpy.ndarray): Rotation axes, broadcast against vectors. A zero axis leaves the vector unchanged.
+        angles (numpy.ndarray): Rotation angles in degrees, broadcast against vectors[..., 0].
 
     Returns:
-    --------
-    None
+        numpy.ndarray: The rotated vectors.
+    """
+    norm_axes = np.linalg.norm(axes, axis=-1, keepdims=True)
+    unit_axes = np.divide(axes, norm_axes, out=np.zeros(np.broadcast(axes, norm_axes).shape), where=norm_axes > 0)
 
-    Notes:
-    ------
-    This function sets up the visualization environment to display opacity and uncertainty volumes
-    using VTK. It loads the opacity and uncertainty volumes from VTK files and prepares them for
-    visualization.
+    # Rodrigues' rotation formula
+    angles = np.radians(angles)[..., np.newaxis]
+    cos_angles = np.cos(angles)
+    rotated = (vectors * cos_angles
+               + np.cross(unit_axes, vectors) * np.sin(angles)
+               + unit_axes * np.einsum('...i,...i->...', unit_axes, vectors)[..., np.newaxis] * (1.0 - cos_angles))
+    return np.where(norm_axes > 0, rotated, vectors)
+
+
+def view_up_table(orientation, azimuth, elevation):
     """
-    colors = vtk.vtkNamedColors()
+    Determine for every azimuth/elevation pair whether the camera needs the z-axis as view up.
 
-    dataset = "chair"            # dataset: lego / hotdog / chair
-    dataset_size = "full"       # full or partial
-    iterations = 200000
+    Parameters:
+        orientation (helpers.CameraState): Camera state every viewpoint starts from.
+        azimuth (list): Azimuth angles in degrees.
+        elevation (list): Elevation angles in degrees.
 
-    data_folder = "data"
+    Returns:
+        numpy.ndarray: Boolean array of shape (len(azimuth), len(elevation)), True where the view up
+        vector is (nearly) parallel to the view plane normal.
+    """
+    view_up = np.asarray(orientation.view_up, dtype=np.float64)
+    # View plane normal direction, from the focal point to the camera
+    normal = np.subtract(orientation.position, orientation.focal_point, dtype=np.float64)
 
-    opacity_file_name = "{}_{}_{}_opacity.vtk".format(dataset, dataset_size, iterations)
-    opacity_file_path = os.path.join(data_folder, opacity_file_name)
-    opacity_volume, opacity_reader = helpers.vtk_read_volume_from_file(opacity_file_path)
+    # vtkCamera.Azimuth rotates the camera about the view up vector through the focal point
+    normals = rotate_vectors(normal, view_up, np.asarray(azimuth, dtype=np.float64))
 
-    uncertainty_file_name = "{}_{}_{}_uncertainty.vtk".format(dataset, dataset_size, iterations)
-    uncertainty_file_path = os.path.join(data_folder, uncertainty_file_name)
+    # vtkCamera.Elevation rotates it about the negated sideways axis of the view transform,
+    # cross(view plane normal, view up)
+    sideways = np.cross(normals, view_up)
+    normals = rotate_vectors(normals[:, np.newaxis, :], sideways[:, np.newaxis, :],
+                             np.asarray(elevation, dtype=np.float64)[np.newaxis, :])
+
+    # Neither rotation changes the view up vector of the camera
+    _, cos_similarity = similarity_vectors(np.broadcast_to(view_up, normals.shape), normals)
+    return np.abs(cos_similarity) > 0.95
+
+
+def build_scene(opacity_file_path, uncertainty_file_path, isosurface_value, offscreen=False):
+    """
+    Load the volumes and set up the isosurface and uncertainty renderers.
+
+    Parameters:
+        opacity_file_path (str): Path of the opacity VTK file.
+        uncertainty_file_path (str): Path of the uncertainty VTK file.
+        isosurface_value (float): Opacity value of the isosurface.
+        offscreen (bool): If True, the render windows render off-screen.
+
+    Returns:
+        dict: Renderers, render windows, interactors (None if offscreen), the shared camera with its
+        initial orientation and the z-buffer arrays of the scene.
+    """
+    colors = vtk.vtkNamedColors()
+
+    opacity_volume, opacity_reader = helpers.vtk_read_volume_from_file(opacity_file_path)
     uncertainty_volume, uncertainty_reader = helpers.vtk_read_volume_from_file(uncertainty_file_path)
 
     """
     Isosurface
     """
-    isosurface_value = 0.90
-    
     contour_opacity = helpers.vtk_contour_filter(opacity_volume, filter_value=isosurface_value)
     mapper_opacity = helpers.vtk_poly_data_mapper(contour_opacity)
     actor_opacity = helpers.vtk_create_actor(mapper_opacity, 'Green')
@@ -90,31 +135,188 @@ def main():
     Renderers
     """
     # isosurface
-    interactor_isosurface = vtk.vtkRenderWindowInteractor()
     render_window_isosurface = vtk.vtkRenderWindow()
     renderer_isosurface = vtk.vtkRenderer()
-
     render_window_isosurface.AddRenderer(renderer_isosurface)
-    interactor_isosurface.SetRenderWindow(render_window_isosurface)
 
     renderer_isosurface.AddVolume(actor_opacity)
     renderer_isosurface.SetBackground(colors.GetColor3d('White'))
 
     # uncertainty
-    interactor_uncertainty = vtk.vtkRenderWindowInteractor()
     render_window_uncertainty = vtk.vtkRenderWindow()
     renderer_uncertainty = vtk.vtkRenderer()
-
     render_window_uncertainty.AddRenderer(renderer_uncertainty)
-    interactor_uncertainty.SetRenderWindow(render_window_uncertainty)
 
     renderer_uncertainty.AddVolume(volume_uncertainty)
     renderer_uncertainty.SetBackground(colors.GetColor3d('Black'))
 
-    # Initialize camera and orientation
+    interactor_isosurface = None
+    interactor_uncertainty = None
+    if offscreen:
+        render_window_isosurface.SetOffScreenRendering(True)
+        render_window_uncertainty.SetOffScreenRendering(True)
+    else:
+        interactor_isosurface = vtk.vtkRenderWindowInteractor()
+        interactor_isosurface.SetRenderWindow(render_window_isosurface)
+        interactor_uncertainty = vtk.vtkRenderWindowInteractor()
+        interactor_uncertainty.SetRenderWindow(render_window_uncertainty)
+
+    # Initialize camera and orientation (before the first render, which may adjust the camera)
     camera = renderer_isosurface.GetActiveCamera()
     original_orient = helpers.vtk_get_orientation(renderer_isosurface)
-    print("original_orient: ", original_orient["orientation"])
+
+    # Render once so the window sizes are final, they do not change during the sweep
+    render_window_isosurface.Render()
+    render_window_uncertainty.Render()
+    xmax_isosurface, ymax_isosurface = render_window_isosurface.GetActualSize()
+    xmax_uncertainty, ymax_uncertainty = render_window_uncertainty.GetActualSize()
+
+    # Initialize arrays to store z-buffer data, sized once for the whole sweep
+    z_buffer_data_isosurface = vtk.vtkFloatArray()
+    z_buffer_data_isosurface.SetNumberOfTuples(xmax_isosurface*ymax_isosurface)
+    z_buffer_data_uncertainty = vtk.vtkFloatArray()
+    z_buffer_data_uncertainty.SetNumberOfTuples(xmax_uncertainty*ymax_uncertainty)
+
+    return {
+        'renderer_isosurface': renderer_isosurface,
+        'renderer_uncertainty': renderer_uncertainty,
+        'render_window_isosurface': render_window_isosurface,
+        'render_window_uncertainty': render_window_uncertainty,
+        'interactor_isosurface': interactor_isosurface,
+        'interactor_uncertainty': interactor_uncertainty,
+        'camera': camera,
+        'orientation': original_orient,
+        'size_isosurface': (xmax_isosurface, ymax_isosurface),
+        'size_uncertainty': (xmax_uncertainty, ymax_uncertainty),
+        'z_buffer_data_isosurface': z_buffer_data_isosurface,
+        'z_buffer_data_uncertainty': z_buffer_data_uncertainty,
+    }
+
+
+def eval_view(scene, orientation, azimuth_angle, elevation_angle, view_up_z):
+    """
+    Render the scene from one viewpoint and compute the mean and standard deviation of the uncertainty image.
+
+    Parameters:
+        scene (dict): Scene created by build_scene.
+        orientation (helpers.CameraState): Camera state the viewpoint starts from.
+        azimuth_angle (float): Azimuth angle in degrees (east-west).
+        elevation_angle (float): Elevation angle in degrees (north-south).
+        view_up_z (bool): If True, the z-axis is used as view up vector (see view_up_table).
+
+    Returns:
+        tuple: Mean and standard deviation of the pixel values.
+    """
+    renderer_isosurface = scene['renderer_isosurface']
+    renderer_uncertainty = scene['renderer_uncertainty']
+    render_window_isosurface = scene['render_window_isosurface']
+    render_window_uncertainty = scene['render_window_uncertainty']
+    camera = scene['camera']
+    xmax_isosurface, ymax_isosurface = scene['size_isosurface']
+    xmax_uncertainty, ymax_uncertainty = scene['size_uncertainty']
+
+    # Reset camera orientations
+    helpers.vtk_set_orientation(renderer_isosurface, orientation)
+    helpers.vtk_set_orientation(renderer_uncertainty, orientation)
+
+    # Set azimuth and elevation angles
+    camera.Azimuth(azimuth_angle) # east-west
+    camera.Elevation(elevation_angle) # north-south
+
+    # Adjust view up vector based on camera orientation
+    if view_up_z:
+        camera.SetViewUp(0.0, 0.0, 1.0)
+    else:
+        camera.SetViewUp(0.0, 1.0, 0.0)
+
+    # Reset cameras and renderers
+    renderer_isosurface.ResetCamera()
+    renderer_uncertainty.SetActiveCamera(camera)
+    renderer_uncertainty.ResetCamera()
+
+    # === Z-buffer === #
+    # Calculate Z-buffer data
+    renderer_isosurface.PreserveDepthBufferOff()
+    render_window_isosurface.Render()
+
+    renderer_uncertainty.PreserveDepthBufferOff()
+    render_window_uncertainty.Render()
+
+    # Get Z-buffer data for isosurface and uncertainty renderers
+    render_window_isosurface.GetZbufferData(0, 0, ymax_isosurface-1, xmax_isosurface-1, scene['z_buffer_data_isosurface'])
+
+    renderer_uncertainty.PreserveDepthBufferOn()
+    render_window_uncertainty.GetZbufferData(0, 0, ymax_uncertainty-1, xmax_uncertainty-1, scene['z_buffer_data_uncertainty'])
+    render_window_uncertainty.SetZbufferData(0, 0, ymax_uncertainty-1, xmax_uncertainty-1, scene['z_buffer_data_isosurface'])
+    # ================ #
+
+    # Render windows
+    render_window_isosurface.Render()
+    render_window_uncertainty.Render()
+
+    # Calculate mean and standard deviation of the rendered uncertainty
+    # (the azimuth and elevation lengths are not used by mean_standard_deviation)
+    return helpers.mean_standard_deviation(None, None, render_window_uncertainty)
+
+
+def _eval_views(opacity_file_path, uncertainty_file_path, isosurface_value, views):
+    """
+    Worker of the parallel sweep: build an off-screen scene and evaluate a list of viewpoints.
+
+    Parameters:
+        opacity_file_path (str): Path of the opacity VTK file.
+        uncertainty_file_path (str): Path of the uncertainty VTK file.
+        isosurface_value (float): Opacity value of the isosurface.
+        views (list): (azimuth angle, elevation angle, view_up_z) tuples.
+
+    Returns:
+        list: (mean, standard deviation) for each viewpoint.
+    """
+    scene = build_scene(opacity_file_path, uncertainty_file_path, isosurface_value, offscreen=True)
+    return [eval_view(scene, scene['orientation'], *view) for view in views]
+
+
+def main():
+    """
+    Main function to compute the mean and standard deviation of the rendered uncertainty for each viewpoint.
+
+    Parameters:
+    -----------
+    None
+
+    Returns:
+    --------
+    None
+
+    Notes:
+    ------
+    This function loads the opacity and uncertainty volumes from VTK files, renders the uncertainty
+    (occluded by the isosurface) from every azimuth/elevation pair and stores the mean and standard
+    deviation of each rendered image. With n_jobs > 1 (requires joblib) the viewpoints are split
+    across worker processes, each rendering its own off-screen scene.
+    """
+    dataset = "chair"            # dataset: lego / hotdog / chair
+    dataset_size = "full"       # full or partial
+    iterations = 200000
+    n_jobs = 1                  # number of worker processes (requires joblib)
+
+    data_folder = "data"
+
+    opacity_file_name = "{}_{}_{}_opacity.vtk".format(dataset, dataset_size, iterations)
+    opacity_file_path = os.path.join(data_folder, opacity_file_name)
+
+    uncertainty_file_name = "{}_{}_{}_uncertainty.vtk".format(dataset, dataset_size, iterations)
+    uncertainty_file_path = os.path.join(data_folder, uncertainty_file_name)
+
+    isosurface_value = 0.90
+
+    parallel = n_jobs > 1 and joblib is not None
+
+    # With worker processes this scene only provides the initial orientation, so it is not shown
+    scene = build_scene(opacity_file_path, uncertainty_file_path, isosurface_value, offscreen=parallel)
+
+    original_orient = scene['orientation']
+    print("original_orient: ", original_orient.orientation)
 
     # Define azimuth and elevation angles for rendering
     azimuth = [i for i in range(0, 360+1, 15)]    # east-west
@@ -122,81 +324,39 @@ def main():
     azimuth_len = len(azimuth)
     elevation_len = len(elevation)
 
-    # Initialize arrays to store mean and standard deviation of z-buffer data
-    means_uncertainty = np.zeros((azimuth_len, elevation_len))
-    standard_deviations_uncertainty = np.zeros((azimuth_len, elevation_len))
+    # View up vector to use for each viewpoint
+    view_up_z = view_up_table(original_orient, azimuth, elevation)
 
-    # Initialize arrays to store z-buffer data
-    z_buffer_data_isosurface = vtk.vtkFloatArray()
-    z_buffer_data_uncertainty = vtk.vtkFloatArray()
+    views = [(azimuth[i], elevation[j], bool(view_up_z[i, j])) for i in range(azimuth_len) for j in range(elevation_len)]
+
+    # Angles of 0 and 360 degrees frame the scene identically, so each distinct
+    # (azimuth, elevation, view up) framing is rendered only once
+    view_keys = [(azimuth_angle % 360, elevation_angle % 360, up_z) for azimuth_angle, elevation_angle, up_z in views]
+    unique_views = {}
+    for view, view_key in zip(views, view_keys):
+        unique_views.setdefault(view_key, view)
+    unique_views = list(unique_views.items())
+
+    if parallel:
+        chunks = [[view for _, view in unique_views[k::n_jobs]] for k in range(n_jobs)]
+        chunk_results = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(_eval_views)(opacity_file_path, uncertainty_file_path, isosurface_value, chunk) for chunk in chunks)
+        unique_results = [None]*len(unique_views)
+        for k, chunk_result in enumerate(chunk_results):
+            unique_results[k::n_jobs] = chunk_result
+    else:
+        unique_results = [eval_view(scene, original_orient, *view) for _, view in unique_views]
+
+    view_results = {view_key: result for (view_key, _), result in zip(unique_views, unique_results)}
+
+    # Mean and standard deviation of each viewpoint
+    results = np.array([view_results[view_key] for view_key in view_keys]).reshape(azimuth_len, elevation_len, 2)
+    means_uncertainty = results[..., 0]
+    standard_deviations_uncertainty = results[..., 1]
+
+    uncertainty_file = os.path.join(data_folder, "uncertainty.npz")
 
-    for i in range(azimuth_len):
-        for j in range(elevation_len):
-            """
-            Iterate through azimuth and elevation angles for rendering and z-buffer calculation.
-            """
-            # Reset camera orientations
-            helpers.vtk_set_orientation(renderer_isosurface, original_orient)
-            helpers.vtk_set_orientation(renderer_uncertainty, original_orient)
-
-            # Set azimuth and elevation angles
-            camera.Azimuth(azimuth[i]) # east-west
-            camera.Elevation(elevation[j]) # north-south
-
-            # Adjust view up vector based on camera orientation
-            view_up_vector = camera.GetViewUp()
-            view_plane_normal = camera.GetViewPlaneNormal()
-
-            angle, cos_similarity = similarity_vectors(view_up_vector, view_plane_normal)
-            # print("azimuth: {}  | elevation: {} | angle: {:.2f} | cosine similarity: {:.2f}".format(azimuth[i], elevation[j], angle, cos_similarity))
-
-            if abs(cos_similarity) > 0.95:
-                camera.SetViewUp(0.0, 0.0, 1.0)
-            else:
-                camera.SetViewUp(0.0, 1.0, 0.0)
-                
-            # Reset cameras and renderers
-            renderer_isosurface.ResetCamera()
-            renderer_uncertainty.SetActiveCamera(camera)
-            renderer_uncertainty.ResetCamera()
-
-            # === Z-buffer === #
-            # Calculate Z-buffer data
-            renderer_isosurface.PreserveDepthBufferOff()
-            renderer_isosurface.GetRenderWindow().Render()
-
-            renderer_uncertainty.PreserveDepthBufferOff()
-            renderer_uncertainty.GetRenderWindow().Render()
-
-            # Get Z-buffer data for isosurface and uncertainty renderers
-            xmax_isosurface, ymax_isosurface = renderer_isosurface.GetRenderWindow().GetActualSize()
-            renderer_isosurface.GetRenderWindow().GetZbufferData(0, 0, ymax_isosurface-1, xmax_isosurface-1, z_buffer_data_isosurface)
-
-            xmax_uncertainty, ymax_uncertainty = renderer_uncertainty.GetRenderWindow().GetActualSize()
-            renderer_uncertainty.PreserveDepthBufferOn()
-            renderer_uncertainty.GetRenderWindow().GetZbufferData(0, 0, ymax_uncertainty-1, xmax_uncertainty-1, z_buffer_data_uncertainty)
-            renderer_uncertainty.GetRenderWindow().SetZbufferData(0, 0, ymax_uncertainty-1, xmax_uncertainty-1, z_buffer_data_isosurface)
-
-            # renderer_isosurface.GetRenderWindow().Render()
-            # renderer_uncertainty.GetRenderWindow().Render()
-            # ================ #
-
-            # Render windows
-            render_window_isosurface.Render()
-            render_window_uncertainty.Render()
-
-            # Calculate mean and standard deviation of z-buffer data
-            mean, standard_deviation = helpers.mean_standard_deviation(azimuth_len, elevation_len, render_window_uncertainty)
-
-            # Assign values to arrays
-            means_uncertainty[i][j] = mean
-            standard_deviations_uncertainty[i][j] = standard_deviation
-
-    means_file = os.path.join(data_folder, "uncertainty_means.csv")
-    stddev_file = os.path.join(data_folder, "uncertainty_standard_deviations.csv")
-
-    np.savetxt(means_file, means_uncertainty, delimiter=",")
-    np.savetxt(stddev_file, standard_deviations_uncertainty, delimiter=",")
+    np.savez_compressed(uncertainty_file, means=means_uncertainty, std=standard_deviations_uncertainty)
 
 if __name__ == "__main__":
     start_time = datetime.now()